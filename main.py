@@ -5,10 +5,14 @@ Legacy pipeline entrypoint is commented out for the v2 workflow refactor.
 See src/ui/app.py for the interactive chatbot UI.
 """
 
+import logging
+
 from src.ui.app import launch_app
 
 
 def main() -> None:
+    logging.basicConfig(format="%(message)s")
+    logging.getLogger("src").setLevel(logging.INFO)
     launch_app()
 
 
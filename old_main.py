@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import argparse
 import asyncio
+import logging
 import sys
 from pathlib import Path
 
@@ -250,6 +251,10 @@ def main() -> None:
     # Load environment variables from .env (including HUGGINGFACEHUB_API_TOKEN,
     # ANTHROPIC_API_KEY, etc.) before any networked tools (RAG, PydanticAI) run.
     load_dotenv(override=True)
+    # Show the tools' progress logs (e.g. route building) alongside the prints;
+    # third-party libraries stay at the default WARNING.
+    logging.basicConfig(format="%(message)s")
+    logging.getLogger("src").setLevel(logging.INFO)
     parser = argparse.ArgumentParser(
         description="AI Control Tower for U.S. Supply-Chain Resilience (v0.0.1)",
         formatter_class=argparse.RawDescriptionHelpFormatter,
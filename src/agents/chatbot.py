@@ -1,12 +1,17 @@
 from __future__ import annotations
 
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
+from functools import lru_cache, partial
 from pathlib import Path
 from typing import Any
 
+import orjson
 import yaml
 import requests
+from requests.adapters import HTTPAdapter
 import subprocess
+import threading
 
 import re
 from src.agents.refactor_agent import run_demo_conversion
@@ -14,6 +19,41 @@ from src.tools.ses_mailer import broadcast_risk_alert_ses
 from src.tools.pseudo_company_rag import PseudoCompanyRAG, PseudoCompanyRAGConfig
 
 
+# Shared keep-alive session for Ollama: the health check and chat request of
+# every reply reuse pooled connections instead of reconnecting each time.
+_HTTP = requests.Session()
+_HTTP.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
+_HTTP.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
+_JSON_HEADERS = {"Content-Type": "application/json"}
+# Runs health checks beside the chat request, which stays on the caller's
+# thread; checks are short, so the size does not cap concurrent chats.
+_OLLAMA_POOL = ThreadPoolExecutor(max_workers=16, thread_name_prefix="ollama")
+# (endpoint, model) pairs whose last health check passed.
+_HEALTHY_MODELS: set[tuple[str, str]] = set()
+
+
+_ALERT_DATE_RE = re.compile(r"today is (\d{4}-\d{2}-\d{2})")
+_EMAIL_RE = re.compile(r"my email is ([^\s,;]+)", re.IGNORECASE)
+# NAME column of `ollama list` output (first field of each non-blank line).
+_MODEL_NAME_RE = re.compile(r"^[ \t]*(\S+)", re.MULTILINE)
+# Entities with a local knowledge index (lower-case).
+KNOWN_COMPANIES = frozenset({"asteria circuits"})
+# One alternation over every known entity, longest first; matched on lower case.
+_KNOWN_COMPANY_RE = re.compile(
+    "|".join(map(re.escape, sorted(KNOWN_COMPANIES, key=len, reverse=True)))
+)
+
+
+@dataclass(frozen=True, slots=True)
+class ParsedMessage:
+    """Intents found in a user message, shared by the UI and `generate_reply`."""
+
+    alert_date: str | None
+    recipient: str | None
+    mentions_company: bool
+    is_demo: bool
+
+
 @dataclass(frozen=True)
 class ChatbotConfig:
     mode: str
@@ -24,8 +64,24 @@ class ChatbotConfig:
     system_prompt: str
 
 
+# libyaml's C loader when PyYAML was built with it; same safe semantics.
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+@lru_cache(maxsize=8)
+def _parse_yaml(path: str, mtime_ns: int, size: int) -> dict[str, Any]:
+    return yaml.load(Path(path).read_text(encoding="utf-8"), Loader=_YAML_LOADER) or {}
+
+
 def _load_yaml(path: Path) -> dict[str, Any]:
-    return yaml.safe_load(path.read_text(encoding="utf-8")) or {}
+    """Parse a config file once per edit; the result is shared, do not mutate.
+
+    Edits are detected by mtime and size together, so a rewrite landing within
+    the filesystem's timestamp granularity is still picked up.
+    """
+
+    stat = path.stat()
+    return _parse_yaml(str(path), stat.st_mtime_ns, stat.st_size)
 
 
 def load_chatbot_config(project_root: Path) -> ChatbotConfig:
@@ -55,15 +111,8 @@ def list_local_models() -> list[str]:
     except subprocess.CalledProcessError:
         return []
 
-    lines = [line.strip() for line in result.stdout.splitlines() if line.strip()]
-    if len(lines) <= 1:
-        return []
-    models = []
-    for line in lines[1:]:
-        parts = line.split()
-        if parts:
-            models.append(parts[0])
-    return models
+    # First field of every non-blank line, minus the header row.
+    return _MODEL_NAME_RE.findall(result.stdout)[1:]
 
 
 def _ollama_chat(
@@ -83,11 +132,14 @@ def _ollama_chat(
         "stream": False,
     }
     try:
-        response = requests.post(
-            f"{endpoint}/api/chat", json=payload, timeout=timeout
+        response = _HTTP.post(
+            f"{endpoint}/api/chat",
+            data=orjson.dumps(payload),
+            headers=_JSON_HEADERS,
+            timeout=timeout,
         )
         response.raise_for_status()
-        data = response.json()
+        data = orjson.loads(response.content)
         return data.get("message", {}).get("content", "").strip() or "(No response.)"
     except Exception as exc:
         return (
@@ -100,9 +152,9 @@ def _ollama_healthcheck(*, endpoint: str, model: str, timeout: int = 5) -> str |
     """Return an error message if Ollama or the model is unavailable."""
 
     try:
-        response = requests.get(f"{endpoint}/api/tags", timeout=timeout)
+        response = _HTTP.get(f"{endpoint}/api/tags", timeout=timeout)
         response.raise_for_status()
-        data = response.json()
+        data = orjson.loads(response.content)
         models = {item.get("name") for item in data.get("models", [])}
         if model not in models:
             return (
@@ -114,39 +166,108 @@ def _ollama_healthcheck(*, endpoint: str, model: str, timeout: int = 5) -> str |
         return f"Ollama health check failed: {exc}"
 
 
+def _warm_up(project_root: Path, model_override: str | None) -> None:
+    # Best effort: config or server problems surface on the first reply.
+    try:
+        config = load_chatbot_config(project_root)
+        if config.provider != "local" or config.backend != "ollama":
+            return
+        # A generate request without a prompt only loads the model into memory.
+        _HTTP.post(
+            f"{config.endpoint}/api/generate",
+            data=orjson.dumps({"model": model_override or config.model}),
+            headers=_JSON_HEADERS,
+            timeout=120,
+        )
+    except Exception:
+        pass
+
+
+def warm_up_model(*, project_root: Path, model_override: str | None = None) -> None:
+    """Start loading the local chat model in the background.
+
+    Ollama loads weights lazily, so without this the first chat turn also pays
+    for the model load. Returns immediately; config and server failures are
+    ignored here and surface on the first reply instead.
+    """
+
+    threading.Thread(
+        target=_warm_up,
+        args=(project_root, model_override),
+        name="ollama-warmup",
+        daemon=True,
+    ).start()
+
+
+@lru_cache(maxsize=2)
+def _pseudo_company_rag(project_root: Path) -> PseudoCompanyRAG:
+    """Return the process-wide pseudo company RAG engine for `project_root`.
+
+    The engine keeps its loaded index after the first query, so reusing one
+    instance skips rebuilding the config and re-attaching the index per reply.
+    """
+
+    return PseudoCompanyRAG(
+        PseudoCompanyRAGConfig(
+            json_path=project_root / "data" / "input" / "pseudo_company_supply_chain.json",
+            index_dir=project_root / ".vector_store" / "pseudo_company",
+        )
+    )
+
+
+@lru_cache(maxsize=64)
+def _pseudo_company_results(
+    project_root: Path, user_message: str
+) -> tuple[tuple[str, float], ...]:
+    """Memoize the read-only RAG lookup for repeated questions.
+
+    Only this side-effect-free path is cached; alert broadcasts and demo
+    conversions always run. Failures propagate and are not cached.
+    """
+
+    rag = _pseudo_company_rag(project_root)
+    return tuple(rag.query_supply_chain(user_message, k=3, min_score=0.2))
+
+
+def parse_message(user_message: str) -> ParsedMessage:
+    """Extract the chatbot's intents from a user message in one pass."""
+
+    lower_message = user_message.lower()
+    # Pattern match for "today is YYYY-MM-DD" (e.g., "today is 2023-01-04, check risks")
+    date_match = _ALERT_DATE_RE.search(lower_message)
+    email_match = _EMAIL_RE.search(user_message)
+    return ParsedMessage(
+        alert_date=date_match.group(1) if date_match else None,
+        recipient=email_match.group(1) if email_match else None,
+        # A "company <name>" phrase naming a known entity is itself a substring
+        # of the message, so this single scan covers both phrasings.
+        mentions_company=_KNOWN_COMPANY_RE.search(lower_message) is not None,
+        is_demo="demo" in lower_message,
+    )
+
+
 def generate_reply(
-    *, project_root: Path, user_message: str, model_override: str | None = None
+    *,
+    project_root: Path,
+    user_message: str,
+    model_override: str | None = None,
+    parsed: ParsedMessage | None = None,
 ) -> str:
-    # Pattern match for "today is YYYY-MM-DD" (e.g., "today is 2023-01-04, check risks")
-    date_match = re.search(r"today is (\d{4}-\d{2}-\d{2})", user_message.lower())
-    email_match = re.search(r"my email is ([^\s,;]+)", user_message, re.IGNORECASE)
-    if date_match:
-        target_date = date_match.group(1)
+    """Answer one chat turn; pass `parsed` to reuse an earlier `parse_message`."""
+
+    if parsed is None:
+        parsed = parse_message(user_message)
+    if parsed.alert_date:
         ses_kwargs: dict[str, Any] = {}
-        if email_match:
-            ses_kwargs["placeholder_recipient"] = email_match.group(1)
+        if parsed.recipient:
+            ses_kwargs["placeholder_recipient"] = parsed.recipient
         # In a real scenario, these keys would come from the user or env vars
         # For now, we call it without keys, relying on env vars or error handling
-        return broadcast_risk_alert_ses(target_date=target_date, **ses_kwargs)
+        return broadcast_risk_alert_ses(target_date=parsed.alert_date, **ses_kwargs)
 
-    lower_message = user_message.lower()
-    company_match = re.search(
-        r"(?:for the company|company)\s+([a-z0-9\s\-]+?)(?:,|\?|$)",
-        lower_message,
-    )
-    company_name = company_match.group(1).strip() if company_match else ""
-    if "asteria circuits" in lower_message or company_name == "asteria circuits":
+    if parsed.mentions_company:
         try:
-            rag = PseudoCompanyRAG(
-                PseudoCompanyRAGConfig(
-                    json_path=project_root
-                    / "data"
-                    / "input"
-                    / "pseudo_company_supply_chain.json",
-                    index_dir=project_root / ".vector_store" / "pseudo_company",
-                )
-            )
-            results = rag.query_supply_chain(user_message, k=3, min_score=0.2)
+            results = _pseudo_company_results(project_root, user_message)
         except Exception as exc:
             return f"Pseudo company knowledge base is unavailable. Details: {exc}"
 
@@ -159,7 +280,7 @@ def generate_reply(
                 lines.append(f"- ({score:.2f}) {record}")
             return "\n".join(lines)
 
-    if "demo" in user_message.lower():
+    if parsed.is_demo:
         conversion_result = run_demo_conversion(project_root=project_root)
         return "\n".join(
             [
@@ -178,15 +299,40 @@ def generate_reply(
     if config.backend != "ollama":
         return "Unsupported local backend. Set llm.local.backend=ollama."
     model = model_override or config.model
-    health_error = _ollama_healthcheck(endpoint=config.endpoint, model=model)
-    if health_error:
-        return f"{health_error}"
-    return _ollama_chat(
+    target = (config.endpoint, model)
+    chat = partial(
+        _ollama_chat,
         endpoint=config.endpoint,
         model=model,
         system_prompt=config.system_prompt,
         user_message=user_message,
     )
+    if target not in _HEALTHY_MODELS:
+        # Unknown or failing model: check first, so it gets no chat request.
+        health_error = _ollama_healthcheck(endpoint=config.endpoint, model=model)
+        if health_error:
+            return f"{health_error}"
+        _HEALTHY_MODELS.add(target)
+        return chat()
+    # Known-good model: re-check alongside the chat request, so the reply
+    # waits for the slower of the two rather than their sum.
+    health = _OLLAMA_POOL.submit(
+        _ollama_healthcheck, endpoint=config.endpoint, model=model
+    )
+    reply = chat()
+    health_error = health.result()
+    if health_error:
+        _HEALTHY_MODELS.discard(target)
+        return f"{health_error}"
+    return reply
 
 
-__all__ = ["generate_reply", "load_chatbot_config", "list_local_models"]
+__all__ = [
+    "KNOWN_COMPANIES",
+    "ParsedMessage",
+    "generate_reply",
+    "load_chatbot_config",
+    "list_local_models",
+    "parse_message",
+    "warm_up_model",
+]
@@ -1,11 +1,19 @@
 from __future__ import annotations
 
 import csv
-import json
 from pathlib import Path
 from typing import Dict, List
 
+import orjson
+
 MISSING_SENTINELS = {"", "na", "n/a", "null", "none", "nan"}
+# Template field -> provider CSV column; None marks fields with a fixed value.
+PROVIDER_FIELD_MAP = {
+    "timestamp": "date",
+    "location.county": "county_name",
+    "risk_score": "predicted_risk_score",
+    "risk_score_max": None,  # fixed value = 100
+}
 
 
 def _is_missing(value: str) -> bool:
@@ -74,7 +82,7 @@ def check_csv_against_template(
     if not template_path.exists():
         return f"Data checker error: template not found at {template_path}"
     try:
-        template = json.loads(template_path.read_text(encoding="utf-8"))
+        template = orjson.loads(template_path.read_bytes())
     except Exception as exc:
         return f"Data checker error: failed to parse template JSON: {exc}"
 
@@ -121,16 +129,9 @@ def check_provider_dataset(
     if not template_path.exists():
         return f"Data checker error: template not found at {template_path}"
 
-    template = json.loads(template_path.read_text(encoding="utf-8"))
+    template = orjson.loads(template_path.read_bytes())
     required_fields = set(_flatten_keys(template))
 
-    field_map = {
-        "timestamp": "date",
-        "location.county": "county_name",
-        "risk_score": "predicted_risk_score",
-        "risk_score_max": None,  # fixed value = 100
-    }
-
     with csv_path.open(newline="", encoding="utf-8") as file:
         reader = csv.DictReader(file)
         if not reader.fieldnames:
@@ -139,8 +140,8 @@ def check_provider_dataset(
 
     mapped_missing = []
     for required in sorted(required_fields):
-        if required in field_map:
-            mapped = field_map[required]
+        if required in PROVIDER_FIELD_MAP:
+            mapped = PROVIDER_FIELD_MAP[required]
             if mapped and mapped not in csv_fields:
                 mapped_missing.append(f"{required} -> {mapped}")
             continue
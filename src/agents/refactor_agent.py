@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from functools import lru_cache
 from pathlib import Path
 from typing import List, Optional
 
@@ -30,6 +31,15 @@ class AgentConfig(BaseModel):
     )
 
 
+_PRIORITY_ICONS = {"HIGH": "🚨", "MEDIUM": "⚠️", "LOW": "ℹ️"}
+# Static closing note appended to every rendered alert.
+_ALERT_FOOTER = (
+    "\n\n---\n\n"
+    "📌 _This alert is generated by the AI control tower prototype aligned with "
+    "S.257 and E.O. 14123 to support U.S. SME supply-chain resilience._"
+)
+
+
 def _derive_priority(risk_score: float) -> AlertPriority:
     if risk_score > 0.9:
         return "HIGH"
@@ -47,7 +57,7 @@ def _render_markdown_alert(
     geo_context: Optional[str] = None,
     logistics_context: Optional[str] = None,
 ) -> str:
-    priority_icon = {"HIGH": "🚨", "MEDIUM": "⚠️", "LOW": "ℹ️"}.get(priority, "ℹ️")
+    priority_icon = _PRIORITY_ICONS.get(priority, "ℹ️")
     header = f"## {priority_icon} Supply Chain Alert ({priority})"
     summary = (
         f"- 🧭 **Risk score**: {signal.risk_score}\n"
@@ -74,18 +84,18 @@ def _render_markdown_alert(
     geo_block = f"\n\n{geo_context.strip()}" if geo_context else ""
     context_block = f"\n\n{policy_context.strip()}" if policy_context else ""
     logistics_block = f"\n\n{logistics_context.strip()}" if logistics_context else ""
-    guidance = (
-        "\n\n---\n\n"
-        "📌 _This alert is generated by the AI control tower prototype aligned with "
-        "S.257 and E.O. 14123 to support U.S. SME supply-chain resilience._"
-    )
-
-    return (
-        "\n\n".join([header, summary, sme_block])
-        + geo_block
-        + logistics_block
-        + context_block
-        + guidance
+    return "".join(
+        (
+            header,
+            "\n\n",
+            summary,
+            "\n\n",
+            sme_block,
+            geo_block,
+            logistics_block,
+            context_block,
+            _ALERT_FOOTER,
+        )
     )
 
 
@@ -144,26 +154,15 @@ def process_risk_signal(
     return report
 
 
-def build_resilience_agent(config: AgentConfig) -> Agent[RiskSignal, ResilienceReport]:
-    """Construct a PydanticAI agent that maps RiskSignal -> ResilienceReport.
-
-    The agent is intentionally simple in v0.0.1 and primarily orchestrates
-    deterministic logic plus a Markdown narrative. In later versions, the
-    `model` provided in `AgentConfig` can be used to co-generate the narrative
-    with deeper policy and sector grounding via RAG.
-
-    Note: For v0.0.1, the agent structure is prepared but the actual processing
-    uses `process_risk_signal()` directly. Future versions will leverage the
-    LLM model for enhanced narrative generation and RAG-based policy grounding.
-    """
-
+@lru_cache(maxsize=4)
+def _resilience_agent(model: str) -> Agent[RiskSignal, ResilienceReport]:
     # In v0.0.1 we primarily use PydanticAI for type-safe orchestration; the
     # `model` parameter accepts a model string (e.g., 'anthropic:claude-3-5-sonnet-latest')
     # which enables easy extension to Claude 3.5 Sonnet or other providers.
     # The agent structure is set up for future RAG integration where the LLM
     # will enhance the markdown generation with policy context.
     return Agent[RiskSignal, ResilienceReport](
-        model=config.model,
+        model=model,
         system_prompt=(
             "You are an AI supply-chain resilience analyst. Given a typed "
             "RiskSignal, generate structured, concise, and policy-aligned "
@@ -191,6 +190,23 @@ def build_resilience_agent(config: AgentConfig) -> Agent[RiskSignal, ResilienceR
     )
 
 
+def build_resilience_agent(config: AgentConfig) -> Agent[RiskSignal, ResilienceReport]:
+    """Construct a PydanticAI agent that maps RiskSignal -> ResilienceReport.
+
+    The agent is intentionally simple in v0.0.1 and primarily orchestrates
+    deterministic logic plus a Markdown narrative. In later versions, the
+    `model` provided in `AgentConfig` can be used to co-generate the narrative
+    with deeper policy and sector grounding via RAG.
+
+    Note: For v0.0.1, the agent structure is prepared but the actual processing
+    uses `process_risk_signal()` directly. Future versions will leverage the
+    LLM model for enhanced narrative generation and RAG-based policy grounding.
+    Agents hold no per-run state, so one instance is reused per model string.
+    """
+
+    return _resilience_agent(config.model)
+
+
 __all__ = ["AgentConfig", "build_resilience_agent", "process_risk_signal"]
 
 
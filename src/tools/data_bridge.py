@@ -1,9 +1,12 @@
 import csv
 import json
+import logging
 import os
 from datetime import datetime
 from pathlib import Path
 
+logger = logging.getLogger(__name__)
+
 DEFAULT_CSV_SOURCE = "file_path/combined_risk_and_impact_predictions.csv"
 DEFAULT_JSON_OUTPUT = "../oact/app/data/data_series.json"
 
@@ -50,7 +53,7 @@ def get_risk_type(score: float, row_data: dict) -> str:
 def run_conversion(*, source_file: Path, dest_file: Path) -> str:
     """Convert risk CSV into time-series JSON for UI consumption."""
 
-    print(f"Reading from: {source_file}")
+    logger.info("Reading from: %s", source_file)
 
     if not source_file.exists():
         return f"Error: Source file not found at {source_file}"
@@ -1,25 +1,78 @@
 from __future__ import annotations
 
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
 from dataclasses import dataclass
-import json
+from functools import lru_cache
 from pathlib import Path
 from typing import Iterable, Tuple
 
+import logging
 import math
+from math import asin, cos, radians, sin, sqrt
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
+import threading
+import time
 
 from geopy.distance import geodesic
 
 from src.tools.schema import AffectedSME
 from src.tools.geo_utils import DeliveryRoute, SMERegistryEntry, load_registry
 
+logger = logging.getLogger(__name__)
+
+_EARTH_RADIUS_KM = 6371.0088
+# Extra slack (degrees) on bounding-box prefilters around the risk radius.
+_BBOX_PAD_DEG = 0.01
+
+# One keep-alive session for all OSRM lookups; the pool is sized to cover the
+# routing threads of `analyze_supply_routes` so each reuses its connection.
+_OSRM_HTTP = requests.Session()
+_OSRM_HTTP.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
+_OSRM_HTTP.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
+_OSRM_ROUTE_URL = "http://router.project-osrm.org/route/v1/driving/"
+# The public OSRM demo server allows about one request per second; routing
+# threads take turns on this schedule instead of hitting it concurrently.
+_OSRM_MIN_INTERVAL_S = 1.0
+_osrm_throttle_lock = threading.Lock()
+_osrm_next_request = 0.0
+
+
+def _wait_for_osrm_slot() -> None:
+    """Block until this thread's turn under the OSRM request-rate limit."""
+
+    global _osrm_next_request
+    with _osrm_throttle_lock:
+        now = time.monotonic()
+        wait = _osrm_next_request - now
+        _osrm_next_request = max(now, _osrm_next_request) + _OSRM_MIN_INTERVAL_S
+    if wait > 0:
+        time.sleep(wait)
+
 
 def _distance_km(origin: Tuple[float, float], dest: Tuple[float, float]) -> float:
+    """Ellipsoidal (geodesic) distance, used for distances reported to users."""
+
     return float(geodesic(origin, dest).km)
 
 
+def _haversine_km(origin: Tuple[float, float], dest: Tuple[float, float]) -> float:
+    """Great-circle distance for hot geometry loops (~0.5% off geodesic)."""
+
+    lat1, lon1 = origin
+    lat2, lon2 = dest
+    phi1 = radians(lat1)
+    phi2 = radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = radians(lon2 - lon1)
+    h = sin(d_phi / 2) ** 2 + cos(phi1) * cos(phi2) * sin(d_lambda / 2) ** 2
+    return 2 * _EARTH_RADIUS_KM * asin(sqrt(min(1.0, h)))
+
+
 def _distance_miles(origin: Tuple[float, float], dest: Tuple[float, float]) -> float:
-    return _distance_km(origin, dest) * 0.621371
+    return _haversine_km(origin, dest) * 0.621371
 
 
 def _closest_point_on_segment(
@@ -40,6 +93,11 @@ def _closest_point_on_segment(
     return (x1 + t * dx, y1 + t * dy)
 
 
+_SME_LABEL_HTML = (
+    '<div style="font-size: 14pt; color: {color}; font-weight: bold;">{name}</div>'
+)
+
+
 @dataclass(frozen=True)
 class RouteImpact:
     sme_id: str
@@ -49,21 +107,38 @@ class RouteImpact:
     interrupted: bool
     intersection_point: Tuple[float, float] | None
     waypoints: list[Tuple[float, float]]
-
-
-def load_highway_corridors(corridors_path: Path) -> dict[str, list[Tuple[float, float]]]:
-    raw = json.loads(corridors_path.read_text(encoding="utf-8"))
+    # One entry per waypoint segment: True when it lies inside the risk radius.
+    segment_flags: tuple[bool, ...] = ()
+    # Risk zone `segment_flags` were computed against.
+    flags_risk_center: Tuple[float, float] | None = None
+    flags_radius_km: float | None = None
+
+
+@lru_cache(maxsize=8)
+def _load_corridors_cached(
+    corridors_path: str, mtime_ns: int
+) -> dict[str, list[Tuple[float, float]]]:
+    raw = orjson.loads(Path(corridors_path).read_bytes())
     corridors: dict[str, list[Tuple[float, float]]] = {}
     for name, points in raw.items():
         corridors[name] = [(float(lat), float(lon)) for lat, lon in points]
     return corridors
 
 
+def load_highway_corridors(corridors_path: Path) -> dict[str, list[Tuple[float, float]]]:
+    """Load corridor polylines, reusing the parsed result until the file changes.
+
+    The returned mapping is shared between callers and must not be mutated.
+    """
+
+    return _load_corridors_cached(str(corridors_path), corridors_path.stat().st_mtime_ns)
+
+
 def _load_osrm_cache(cache_path: Path) -> dict[str, list[Tuple[float, float]]]:
     if not cache_path.exists():
         return {}
     try:
-        raw = json.loads(cache_path.read_text(encoding="utf-8"))
+        raw = orjson.loads(cache_path.read_bytes())
         return {k: [(p[0], p[1]) for p in v] for k, v in raw.items()}
     except Exception:
         return {}
@@ -72,53 +147,68 @@ def _load_osrm_cache(cache_path: Path) -> dict[str, list[Tuple[float, float]]]:
 def _save_osrm_cache(cache_path: Path, cache: dict[str, list[Tuple[float, float]]]) -> None:
     cache_path.parent.mkdir(parents=True, exist_ok=True)
     serializable = {k: [[p[0], p[1]] for p in v] for k, v in cache.items()}
-    cache_path.write_text(json.dumps(serializable, indent=2), encoding="utf-8")
+    cache_path.write_bytes(orjson.dumps(serializable, option=orjson.OPT_INDENT_2))
 
 
 def _cache_key(start_coords: Tuple[float, float], end_coords: Tuple[float, float]) -> str:
     return f"{start_coords[0]:.5f},{start_coords[1]:.5f}|{end_coords[0]:.5f},{end_coords[1]:.5f}"
 
 
+def _store_road_path(
+    cache: dict[str, list[Tuple[float, float]]],
+    key: str,
+    path: list[Tuple[float, float]],
+    *,
+    cache_path: Path | None,
+    cache_lock: threading.Lock | None,
+) -> None:
+    with cache_lock or nullcontext():
+        cache[key] = path
+        if cache_path:
+            _save_osrm_cache(cache_path, cache)
+
+
 def get_real_road_path(
     start_coords: Tuple[float, float],
     end_coords: Tuple[float, float],
     *,
     cache: dict[str, list[Tuple[float, float]]] | None = None,
     cache_path: Path | None = None,
+    cache_lock: threading.Lock | None = None,
 ) -> list[Tuple[float, float]]:
-    """Return dense road path between two points using OSRM."""
+    """Return dense road path between two points using OSRM.
+
+    ``cache_lock`` guards cache updates and persistence when the same cache is
+    shared between threads.
+    """
 
-    cache = cache or {}
+    if cache is None:
+        cache = {}
     key = _cache_key(start_coords, end_coords)
     if key in cache:
         return cache[key]
 
-    print(f"⏳ OSRM route request: {start_coords} -> {end_coords}")
+    logger.debug("OSRM route request: %s -> %s", start_coords, end_coords)
     lon1, lat1 = start_coords[1], start_coords[0]
     lon2, lat2 = end_coords[1], end_coords[0]
     url = (
-        "http://router.project-osrm.org/route/v1/driving/"
-        f"{lon1},{lat1};{lon2},{lat2}?overview=full&geometries=geojson"
+        f"{_OSRM_ROUTE_URL}{lon1},{lat1};{lon2},{lat2}?overview=full&geometries=geojson"
     )
     try:
-        response = requests.get(url, timeout=3)
+        _wait_for_osrm_slot()
+        response = _OSRM_HTTP.get(url, timeout=3)
         response.raise_for_status()
-        payload = response.json()
+        payload = orjson.loads(response.content)
         coords = payload["routes"][0]["geometry"]["coordinates"]
         path = [(lat, lon) for lon, lat in coords]
-        cache[key] = path
-        if cache_path:
-            _save_osrm_cache(cache_path, cache)
-        print(f"✓ OSRM route received: {len(path)} points")
-        return path
     except Exception:
-        # Fallback to straight line if OSRM fails.
-        fallback = [start_coords, end_coords]
-        cache[key] = fallback
-        if cache_path:
-            _save_osrm_cache(cache_path, cache)
-        print("⚠ OSRM route failed; using straight-line fallback")
-        return fallback
+        # Fallback to straight line if OSRM fails. It is not cached, so a
+        # throttled or offline lookup is retried instead of persisted.
+        logger.warning("OSRM route failed; using straight-line fallback")
+        return [start_coords, end_coords]
+    _store_road_path(cache, key, path, cache_path=cache_path, cache_lock=cache_lock)
+    logger.debug("OSRM route received: %d points", len(path))
+    return path
 
 
 def _route_length_miles(route: list[Tuple[float, float]]) -> float:
@@ -166,7 +256,7 @@ def _nearest_point_on_corridor(
     closest_distance = math.inf
     for idx in range(len(corridor) - 1):
         candidate = _closest_point_on_segment(corridor[idx], corridor[idx + 1], point)
-        distance_km = _distance_km(point, candidate)
+        distance_km = _haversine_km(point, candidate)
         if distance_km < closest_distance:
             closest_distance = distance_km
             closest = candidate
@@ -181,8 +271,11 @@ def generate_realistic_routes(
     max_routes: int = 3,
     max_miles: float = 30.0,
     cache_path: Path | None = None,
+    cache: dict[str, list[Tuple[float, float]]] | None = None,
+    cache_lock: threading.Lock | None = None,
 ) -> list[tuple[str, list[Tuple[float, float]]]]:
-    cache = _load_osrm_cache(cache_path) if cache_path else {}
+    if cache is None:
+        cache = _load_osrm_cache(cache_path) if cache_path else {}
     corridor_scores: list[tuple[str, float, int, Tuple[float, float]]] = []
     for name, points in corridors.items():
         nearest_point, index = _nearest_point_on_corridor(points, sme_coords)
@@ -202,6 +295,7 @@ def generate_realistic_routes(
                 raw_route[idx + 1],
                 cache=cache,
                 cache_path=cache_path,
+                cache_lock=cache_lock,
             )
             if dense_route and segment:
                 dense_route.extend(segment[1:])
@@ -246,28 +340,95 @@ def get_smes_in_radius(
     return affected, safe
 
 
-def is_route_interrupted(
-    *,
-    route: DeliveryRoute,
+def _risk_margins_deg(risk_center: Tuple[float, float], radius_km: float) -> Tuple[float, float]:
+    """Conservative lat/lon degree margins that fully contain the risk radius."""
+
+    lat_margin = radius_km / 110.574 + _BBOX_PAD_DEG
+    widest_lat = min(89.0, abs(risk_center[0]) + lat_margin)
+    lon_margin = radius_km / (111.320 * cos(radians(widest_lat))) + _BBOX_PAD_DEG
+    return lat_margin, lon_margin
+
+
+def _scan_route_segments(
+    waypoints: list[Tuple[float, float]],
     risk_center: Tuple[float, float],
     radius_km: float,
-) -> Tuple[bool, Tuple[float, float] | None]:
-    """Check if any segment passes within the risk radius."""
+) -> tuple[tuple[bool, ...], Tuple[float, float] | None]:
+    """Flag every segment within the risk radius.
+
+    Returns the per-segment flags and the first intersection point (if any).
+    Segments whose bounding box is clear of the radius are skipped without
+    any distance computation.
+    """
+
+    segment_count = max(len(waypoints) - 1, 0)
+    risk_lat, risk_lon = risk_center
+    lat_margin, lon_margin = _risk_margins_deg(risk_center, radius_km)
+    lat_lo, lat_hi = risk_lat - lat_margin, risk_lat + lat_margin
+    lon_lo, lon_hi = risk_lon - lon_margin, risk_lon + lon_margin
+
+    if segment_count:
+        lats = [lat for lat, _ in waypoints]
+        lons = [lon for _, lon in waypoints]
+        if (
+            max(lats) < lat_lo
+            or min(lats) > lat_hi
+            or max(lons) < lon_lo
+            or min(lons) > lon_hi
+        ):
+            return (False,) * segment_count, None
+
+    flags: list[bool] = []
+    first_hit: Tuple[float, float] | None = None
+    for idx in range(segment_count):
+        (lat1, lon1), (lat2, lon2) = waypoints[idx], waypoints[idx + 1]
+        if (
+            max(lat1, lat2) < lat_lo
+            or min(lat1, lat2) > lat_hi
+            or max(lon1, lon2) < lon_lo
+            or min(lon1, lon2) > lon_hi
+        ):
+            flags.append(False)
+            continue
+        candidate = _closest_point_on_segment(waypoints[idx], waypoints[idx + 1], risk_center)
+        hit = _haversine_km(risk_center, candidate) <= radius_km
+        if hit and first_hit is None:
+            first_hit = candidate
+        flags.append(hit)
+    return tuple(flags), first_hit
+
+
+def _closest_route_point(
+    waypoints: list[Tuple[float, float]],
+    point: Tuple[float, float],
+) -> Tuple[float, float] | None:
+    """Return the point of the route nearest to `point`, over every segment."""
 
-    waypoints = [(wp.lat, wp.lon) for wp in route.waypoints]
     closest_point: Tuple[float, float] | None = None
     closest_distance = math.inf
     for idx in range(len(waypoints) - 1):
-        start = waypoints[idx]
-        end = waypoints[idx + 1]
-        candidate = _closest_point_on_segment(start, end, risk_center)
-        distance_km = _distance_km(risk_center, candidate)
+        candidate = _closest_point_on_segment(waypoints[idx], waypoints[idx + 1], point)
+        distance_km = _haversine_km(point, candidate)
         if distance_km < closest_distance:
             closest_distance = distance_km
             closest_point = candidate
-        if distance_km <= radius_km:
-            return True, candidate
-    return False, closest_point
+    return closest_point
+
+
+def is_route_interrupted(
+    *,
+    route: DeliveryRoute,
+    risk_center: Tuple[float, float],
+    radius_km: float,
+) -> Tuple[bool, Tuple[float, float] | None]:
+    """Check if any segment passes within the risk radius."""
+
+    waypoints = [(wp.lat, wp.lon) for wp in route.waypoints]
+    _, first_hit = _scan_route_segments(waypoints, risk_center, radius_km)
+    if first_hit is not None:
+        return True, first_hit
+    # No hit: the prefiltered scan skipped far segments, so search them all.
+    return False, _closest_route_point(waypoints, risk_center)
 
 
 def analyze_supply_routes(
@@ -279,20 +440,49 @@ def analyze_supply_routes(
     max_routes: int = 3,
     max_miles: float = 30.0,
     osrm_cache_path: Path | None = None,
+    max_workers: int = 8,
 ) -> list[RouteImpact]:
+    """Build delivery routes for every SME and flag those crossing the risk radius.
+
+    Route building is dominated by OSRM round trips, so SMEs are routed
+    concurrently on a thread pool sharing one OSRM cache; interruption scoring
+    then runs on the calling thread in registry order. Cache hits run in
+    parallel, while new OSRM lookups are held to the public server's rate
+    limit.
+    """
+
     corridors = load_highway_corridors(corridors_path)
-    impacts: list[RouteImpact] = []
-    entries: Iterable[SMERegistryEntry] = load_registry(registry_path)
-    for entry in entries:
-        print(f"🚚 Building routes for {entry.name} ({entry.sme_id})")
+    entries: list[SMERegistryEntry] = load_registry(registry_path)
+    cache = _load_osrm_cache(osrm_cache_path) if osrm_cache_path else {}
+    cache_lock = threading.Lock()
+    cached_before = len(cache)
+
+    def _build_routes(entry: SMERegistryEntry) -> list[tuple[str, list[Tuple[float, float]]]]:
+        logger.info("Building routes for %s (%s)", entry.name, entry.sme_id)
+        # No cache_path here: the shared cache is persisted once after routing
+        # rather than re-serialized in full on every new OSRM result.
         routes = generate_realistic_routes(
             sme_coords=(entry.latitude, entry.longitude),
             corridors=corridors,
             max_routes=max_routes,
             max_miles=max_miles,
-            cache_path=osrm_cache_path,
+            cache=cache,
+            cache_lock=cache_lock,
         )
-        print(f"   ↳ Generated {len(routes)} routes")
+        logger.info("Generated %d routes for %s", len(routes), entry.sme_id)
+        return routes
+
+    impacts: list[RouteImpact] = []
+    if not entries:
+        return impacts
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(entries)))) as executor:
+            routes_by_entry = list(executor.map(_build_routes, entries))
+    finally:
+        if osrm_cache_path and len(cache) != cached_before:
+            _save_osrm_cache(osrm_cache_path, cache)
+
+    for entry, routes in zip(entries, routes_by_entry):
         for corridor_name, waypoints in routes:
             route = DeliveryRoute(
                 origin=entry.name,
@@ -301,11 +491,10 @@ def analyze_supply_routes(
                     {"lat": lat, "lon": lon} for lat, lon in waypoints
                 ],
             )
-            interrupted, intersection_point = is_route_interrupted(
-                route=route,
-                risk_center=risk_center,
-                radius_km=radius_km,
+            segment_flags, intersection_point = _scan_route_segments(
+                waypoints, risk_center, radius_km
             )
+            interrupted = intersection_point is not None
             impacts.append(
                 RouteImpact(
                     sme_id=entry.sme_id,
@@ -313,8 +502,11 @@ def analyze_supply_routes(
                     origin=route.origin,
                     destination=route.destination,
                     interrupted=interrupted,
-                    intersection_point=intersection_point if interrupted else None,
+                    intersection_point=intersection_point,
                     waypoints=waypoints,
+                    segment_flags=segment_flags,
+                    flags_risk_center=tuple(risk_center),
+                    flags_radius_km=radius_km,
                 )
             )
     return impacts
@@ -400,62 +592,61 @@ def generate_risk_map(
 
     label_lat_offset, label_lon_offset = label_offset
 
-    for sme in affected:
-        if sme.latitude is None or sme.longitude is None:
-            continue
-        folium.Marker(
-            location=(sme.latitude + label_lat_offset, sme.longitude + label_lon_offset),
-            tooltip=sme.name,
-            popup=f"{sme.name} — {sme.sector} ({sme.distance_km} km)",
-            icon=folium.DivIcon(
-                html=(
-                    f'<div style="font-size: 14pt; color: {affected_color}; '
-                    'font-weight: bold;">'
-                    f"{sme.name}"
-                    "</div>"
-                )
-            ),
-        ).add_to(map_view)
-
-    for sme in safe:
-        if sme.latitude is None or sme.longitude is None:
-            continue
-        folium.Marker(
-            location=(sme.latitude + label_lat_offset, sme.longitude + label_lon_offset),
-            tooltip=sme.name,
-            popup=f"{sme.name} — {sme.sector} ({sme.distance_km} km)",
-            icon=folium.DivIcon(
-                html=(
-                    f'<div style="font-size: 14pt; color: {safe_color}; '
-                    'font-weight: bold;">'
-                    f"{sme.name}"
-                    "</div>"
-                )
-            ),
-        ).add_to(map_view)
+    sme_labels = folium.FeatureGroup(name="SME labels")
+    for smes, label_color in ((affected, affected_color), (safe, safe_color)):
+        for sme in smes:
+            if sme.latitude is None or sme.longitude is None:
+                continue
+            folium.Marker(
+                location=(sme.latitude + label_lat_offset, sme.longitude + label_lon_offset),
+                tooltip=sme.name,
+                popup=f"{sme.name} — {sme.sector} ({sme.distance_km} km)",
+                icon=folium.DivIcon(
+                    html=_SME_LABEL_HTML.format(color=label_color, name=sme.name)
+                ),
+            ).add_to(sme_labels)
+    sme_labels.add_to(map_view)
 
     if route_impacts:
+        route_lines = folium.FeatureGroup(name="Supply routes")
         for impact in route_impacts:
-            for idx in range(len(impact.waypoints) - 1):
-                start = impact.waypoints[idx]
-                end = impact.waypoints[idx + 1]
-                segment_intersects = False
-                if risk_center and risk_radius_km is not None:
-                    candidate = _closest_point_on_segment(start, end, risk_center)
-                    distance_km = _distance_km(risk_center, candidate)
-                    if distance_km <= risk_radius_km:
-                        segment_intersects = True
-                color = risky_segment_color if segment_intersects else safe_segment_color
+            # Collect segments per status so each route draws at most two lines.
+            segments: dict[bool, list[list[Tuple[float, float]]]] = {True: [], False: []}
+            if risk_center and risk_radius_km is not None:
+                # Reuse the analysis-time flags only when drawing the same zone.
+                flags = impact.segment_flags
+                if (
+                    len(flags) != len(impact.waypoints) - 1
+                    or impact.flags_risk_center != tuple(risk_center)
+                    or impact.flags_radius_km != risk_radius_km
+                ):
+                    flags, _ = _scan_route_segments(
+                        impact.waypoints, risk_center, risk_radius_km
+                    )
+            else:
+                flags = (False,) * max(len(impact.waypoints) - 1, 0)
+            for start, end, segment_intersects in zip(
+                impact.waypoints, impact.waypoints[1:], flags
+            ):
+                runs = segments[segment_intersects]
+                if runs and runs[-1][-1] == start:
+                    runs[-1].append(end)
+                else:
+                    runs.append([start, end])
+            for segment_intersects, runs in segments.items():
+                if not runs:
+                    continue
                 folium.PolyLine(
-                    locations=[start, end],
-                    color=color,
+                    locations=runs,
+                    color=risky_segment_color if segment_intersects else safe_segment_color,
                     weight=3,
                     opacity=0.85,
                     tooltip=(
                         f"Path: {impact.origin} ➔ {impact.destination} | "
                         f"Status: {'CRITICAL BLOCKAGE' if segment_intersects else 'CLEAR'}"
                     ),
-                ).add_to(map_view)
+                ).add_to(route_lines)
+        route_lines.add_to(map_view)
 
     output_path.parent.mkdir(parents=True, exist_ok=True)
     map_view.save(str(output_path))
@@ -1,9 +1,10 @@
 from __future__ import annotations
 
+from functools import lru_cache
 from pathlib import Path
 from typing import List
 
-import json
+import orjson
 from pydantic import BaseModel, Field, ValidationError, confloat, constr
 
 from src.tools.schema import AffectedSME
@@ -33,7 +34,7 @@ class DeliveryRoute(BaseModel):
 
 
 def _load_registry(registry_path: Path) -> List[SMERegistryEntry]:
-    raw = json.loads(registry_path.read_text(encoding="utf-8"))
+    raw = orjson.loads(registry_path.read_bytes())
     if not isinstance(raw, list):  # pragma: no cover - simple guard
         raise ValueError("sme_registry.json must contain a list of SME entries")
     entries: List[SMERegistryEntry] = []
@@ -52,6 +53,23 @@ def load_registry(registry_path: Path) -> List[SMERegistryEntry]:
     return _load_registry(registry_path)
 
 
+@lru_cache(maxsize=8)
+def _county_index(
+    registry_path: str, mtime_ns: int
+) -> tuple[tuple[SMERegistryEntry, ...], dict[str, tuple[int, ...]]]:
+    """Return registry entries and their positions grouped by lowercased county.
+
+    Cached per file version so repeated lookups skip JSON parsing/validation and
+    only test each distinct county once.
+    """
+
+    entries = tuple(_load_registry(Path(registry_path)))
+    positions: dict[str, list[int]] = {}
+    for idx, entry in enumerate(entries):
+        positions.setdefault(entry.county.lower(), []).append(idx)
+    return entries, {county: tuple(idxs) for county, idxs in positions.items()}
+
+
 def find_smes_by_location(
     *, registry_path: Path, location: str
 ) -> List[AffectedSME]:
@@ -62,24 +80,30 @@ def find_smes_by_location(
     """
 
     normalized_location = location.lower()
-    entries = _load_registry(registry_path)
-    affected: List[AffectedSME] = []
-    for entry in entries:
-        county_lower = entry.county.lower()
+    entries, county_positions = _county_index(
+        str(registry_path), registry_path.stat().st_mtime_ns
+    )
+    matched: list[int] = []
+    for county_lower, positions in county_positions.items():
         # Match either:
         # - full county string contained in the location, or
         # - location token (e.g., "monterey") contained in the county name.
         if county_lower in normalized_location or normalized_location in county_lower:
-            affected.append(
-                AffectedSME(
-                    sme_id=entry.sme_id,
-                    name=entry.name,
-                    county=entry.county,
-                    sector=entry.sector,
-                    latitude=entry.latitude,
-                    longitude=entry.longitude,
-                )
+            matched.extend(positions)
+
+    affected: List[AffectedSME] = []
+    for idx in sorted(matched):
+        entry = entries[idx]
+        affected.append(
+            AffectedSME(
+                sme_id=entry.sme_id,
+                name=entry.name,
+                county=entry.county,
+                sector=entry.sector,
+                latitude=entry.latitude,
+                longitude=entry.longitude,
             )
+        )
     return affected
 
 
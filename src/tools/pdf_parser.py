@@ -1,85 +1,130 @@
 from __future__ import annotations
 
+import io
+import os
 import re
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 from pathlib import Path
-from typing import List, Tuple
+from typing import List, Sequence, Tuple
 
 from pypdf import PdfReader
 
 from config.settings import RagMode
 
+_DEHYPHENATE = re.compile(r"(?<=\w)-\n(?=\w)")
+_LEADING_WS = re.compile(r"^[ \t]+", re.MULTILINE)
+_MULTI_BLANK = re.compile(r"\n{3,}")
+# Every line boundary `str.splitlines` recognizes, folded to "\n" before the
+# page-number pass so it sees the same lines.
+_LINE_BREAK = re.compile(r"\r\n|[\r\v\f\x1c\x1d\x1e\x85\u2028\u2029]")
+# Standalone page-number lines ("12", "Page 12"), removed together with their
+# newline. `[^\S\n]` is any in-line whitespace, NBSP included.
+_PAGE_LINE = re.compile(
+    r"^[^\S\n]*(?:page[^\S\n]+)?\d+[^\S\n]*(?:\n|\Z)", re.MULTILINE | re.IGNORECASE
+)
+
+# Below this page count, process start-up costs more than it saves.
+_PARALLEL_MIN_PAGES = 16
+
 
 def _clean_markdown_text(markdown_text: str) -> str:
     """Normalize Markdown extracted from LlamaParse for retrieval."""
 
     text = markdown_text.replace("\r\n", "\n")
-    text = re.sub(r"(?<=\w)-\n(?=\w)", "", text)
-    text = re.sub(r"^[ \t]+", "", text, flags=re.MULTILINE)
-    text = re.sub(r"\n{3,}", "\n\n", text)
-    text = "\n".join(
-        line
-        for line in text.splitlines()
-        if not re.match(r"^\s*(?:page\s+)?\d+\s*$", line, flags=re.IGNORECASE)
-    )
+    text = _DEHYPHENATE.sub("", text)
+    text = _LEADING_WS.sub("", text)
+    text = _MULTI_BLANK.sub("\n\n", text)
+    text = _LINE_BREAK.sub("\n", text)
+    text = _PAGE_LINE.sub("", text)
     return text.strip()
 
 
 def _chunk_markdown(markdown_text: str, *, max_chars: int = 1500, overlap: int = 200) -> List[str]:
-    """Split Markdown into retrieval chunks while keeping section context."""
+    """Split Markdown into retrieval chunks while keeping section context.
+
+    Paragraphs are joined once into a single body and every chunk (including
+    its overlap prefix) is emitted as one slice of that body.
+    """
 
     paragraphs = [p.strip() for p in markdown_text.split("\n\n") if p.strip()]
+    body = "\n\n".join(paragraphs)
     chunks: List[str] = []
-    current: List[str] = []
+    current_start: int | None = None
+    current_end = 0
     current_len = 0
+    offset = 0
 
     for paragraph in paragraphs:
         para_len = len(paragraph)
-        if current and current_len + para_len + 2 > max_chars:
-            chunk = "\n\n".join(current).strip()
+        if current_start is not None and current_len + para_len + 2 > max_chars:
+            chunk = body[current_start:current_end].strip()
             if chunk:
                 chunks.append(chunk)
             if overlap > 0 and chunk:
-                overlap_text = chunk[-overlap:]
-                current = [overlap_text]
-                current_len = len(overlap_text)
+                overlap_len = min(overlap, len(chunk))
+                current_start = current_end - overlap_len
+                current_len = overlap_len
             else:
-                current = []
+                current_start = None
                 current_len = 0
 
-        current.append(paragraph)
+        if current_start is None:
+            current_start = offset
+            current_len = 0
+        current_end = offset + para_len
         current_len += para_len + 2
+        offset = current_end + 2
 
-    if current:
-        chunk = "\n\n".join(current).strip()
+    if current_start is not None:
+        chunk = body[current_start:current_end].strip()
         if chunk:
             chunks.append(chunk)
 
     return chunks
 
 
-def parse_pdf_legacy(pdf_path: Path) -> List[Tuple[str, int]]:
-    """Extract page-level text from PDF using the local parser."""
+def _extract_page_batch(pdf_bytes: bytes, page_indices: Sequence[int]) -> List[Tuple[str, int]]:
+    """Extract stripped text for a batch of pages from an in-memory PDF."""
 
-    if not pdf_path.exists():
-        raise FileNotFoundError(f"PDF not found at {pdf_path}")
-
-    reader = PdfReader(str(pdf_path))
+    reader = PdfReader(io.BytesIO(pdf_bytes))
     texts: List[Tuple[str, int]] = []
-
-    for page_index, page in enumerate(reader.pages):
+    for page_index in page_indices:
         try:
-            page_text = page.extract_text() or ""
+            page_text = reader.pages[page_index].extract_text() or ""
         except Exception as exc:  # pragma: no cover - defensive
             raise RuntimeError(
                 f"Failed to extract text from page {page_index + 1}: {exc}"
             ) from exc
+        texts.append((page_text.strip(), page_index + 1))
+    return texts
+
 
-        page_text = page_text.strip()
-        if not page_text:
-            continue
+def parse_pdf_legacy(pdf_path: Path, *, max_workers: int | None = None) -> List[Tuple[str, int]]:
+    """Extract page-level text from PDF using the local parser.
 
-        texts.append((page_text, page_index + 1))
+    Page extraction is pure Python and CPU-bound, so larger documents are
+    split into page batches across a process pool.
+    """
 
+    if not pdf_path.exists():
+        raise FileNotFoundError(f"PDF not found at {pdf_path}")
+
+    pdf_bytes = pdf_path.read_bytes()
+    page_count = len(PdfReader(io.BytesIO(pdf_bytes)).pages)
+    workers = min(max_workers or os.cpu_count() or 1, page_count)
+
+    if workers <= 1 or page_count < _PARALLEL_MIN_PAGES:
+        pages = _extract_page_batch(pdf_bytes, range(page_count))
+    else:
+        batches = [range(start, page_count, workers) for start in range(workers)]
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = executor.map(partial(_extract_page_batch, pdf_bytes), batches)
+            pages = sorted(
+                (item for batch in results for item in batch), key=lambda item: item[1]
+            )
+
+    texts = [(page_text, page_num) for page_text, page_num in pages if page_text]
     if not texts:
         raise RuntimeError("No text could be extracted from the PDF.")
 
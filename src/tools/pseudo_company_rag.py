@@ -3,11 +3,21 @@ from __future__ import annotations
 from pathlib import Path
 from typing import Any, Iterable, List, Tuple
 
-import json
-import joblib
+import orjson
 from pydantic import BaseModel, Field, ValidationError
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfTransformer
+
+from src.tools.tfidf_utils import (
+    build_hashing_vectorizer,
+    build_score_matrix,
+    cosine_scores,
+    hash_documents,
+    index_exists,
+    load_index,
+    prune_document_frequency,
+    save_index,
+    top_k_indices,
+)
 
 
 class PseudoCompanyRAGConfig(BaseModel):
@@ -36,7 +46,8 @@ class PseudoCompanyRAG:
 
     def __init__(self, config: PseudoCompanyRAGConfig) -> None:
         self._config = config
-        self._vectorizer: TfidfVectorizer | None = None
+        self._vectorizer: HashingVectorizer = build_hashing_vectorizer()
+        self._transformer: TfidfTransformer | None = None
         self._matrix = None
         self._records: List[str] = []
 
@@ -48,16 +59,16 @@ class PseudoCompanyRAG:
         self._config.index_dir.mkdir(parents=True, exist_ok=True)
 
     def _index_exists(self) -> bool:
-        return (self._config.index_dir / "pseudo_company_tfidf.joblib").exists()
+        return index_exists(self._config.index_dir, "pseudo_company_tfidf")
 
     def _load_json(self) -> dict[str, Any]:
         try:
-            return json.loads(self._config.json_path.read_text(encoding="utf-8"))
+            return orjson.loads(self._config.json_path.read_bytes())
         except FileNotFoundError as exc:
             raise RuntimeError(
                 f"Pseudo company dataset not found at {self._config.json_path}."
             ) from exc
-        except json.JSONDecodeError as exc:
+        except orjson.JSONDecodeError as exc:
             raise RuntimeError("Pseudo company dataset JSON is invalid.") from exc
 
     def _iter_records(self, payload: dict[str, Any]) -> Iterable[str]:
@@ -65,17 +76,13 @@ class PseudoCompanyRAG:
             if isinstance(value, list):
                 for idx, entry in enumerate(value, start=1):
                     if isinstance(entry, dict):
-                        lines = [f"{section} #{idx}"]
-                        lines.extend(
-                            f"{key}: {val}" for key, val in entry.items()
+                        yield f"{section} #{idx}" + "".join(
+                            f"\n{key}: {val}" for key, val in entry.items()
                         )
-                        yield "\n".join(lines)
                     else:
                         yield f"{section} #{idx}: {entry}"
             elif isinstance(value, dict):
-                lines = [section]
-                lines.extend(f"{key}: {val}" for key, val in value.items())
-                yield "\n".join(lines)
+                yield section + "".join(f"\n{key}: {val}" for key, val in value.items())
             else:
                 yield f"{section}: {value}"
 
@@ -86,38 +93,31 @@ class PseudoCompanyRAG:
         if not records:
             raise RuntimeError("Pseudo company dataset is empty.")
 
-        vectorizer = TfidfVectorizer(
-            max_features=25_000,
-            ngram_range=(1, 2),
-            stop_words="english",
-        )
-        matrix = vectorizer.fit_transform(records)
+        counts = hash_documents(self._vectorizer, records)
+        transformer = TfidfTransformer()
+        matrix_csc = build_score_matrix(transformer.fit_transform(prune_document_frequency(counts)))
 
-        self._ensure_index_dir()
-        index_file = self._config.index_dir / "pseudo_company_tfidf.joblib"
-        joblib.dump(
-            {
-                "vectorizer": vectorizer,
-                "matrix": matrix,
-                "records": records,
-            },
-            index_file,
+        save_index(
+            self._config.index_dir,
+            "pseudo_company_tfidf",
+            transformer=transformer,
+            matrix_csc=matrix_csc,
+            records=records,
         )
 
-        self._vectorizer = vectorizer
-        self._matrix = matrix
+        self._transformer = transformer
+        self._matrix = matrix_csc
         self._records = records
 
     def _load_or_build_index(self) -> None:
-        if self._vectorizer is not None and self._matrix is not None:
+        if self._transformer is not None and self._matrix is not None:
             return
 
         self._ensure_index_dir()
-        index_file = self._config.index_dir / "pseudo_company_tfidf.joblib"
         if self._index_exists():
-            data = joblib.load(index_file)
-            self._vectorizer = data["vectorizer"]
-            self._matrix = data["matrix"]
+            data = load_index(self._config.index_dir, "pseudo_company_tfidf")
+            self._transformer = data["transformer"]
+            self._matrix = data["matrix_csc"]
             self._records = data["records"]
         else:
             self._build_index()
@@ -132,16 +132,15 @@ class PseudoCompanyRAG:
                 f"Failed to initialize pseudo company RAG index: {exc}"
             ) from exc
 
-        if self._vectorizer is None or self._matrix is None:
+        if self._transformer is None or self._matrix is None:
             raise RuntimeError("Pseudo company RAG index is not initialized.")
 
-        query_vec = self._vectorizer.transform([query])
-        scores = cosine_similarity(query_vec, self._matrix)[0]
-        top_indices = scores.argsort()[::-1][:k]
+        query_vec = self._transformer.transform(self._vectorizer.transform([query]))
+        scores = cosine_scores(self._matrix, query_vec)
+        top_indices = top_k_indices(scores, k)
 
         results: List[Tuple[str, float]] = []
-        for idx in top_indices:
-            score = float(scores[idx])
+        for idx, score in zip(top_indices.tolist(), scores[top_indices].tolist()):
             if score < min_score:
                 continue
             results.append((self._records[idx], score))
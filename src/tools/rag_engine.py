@@ -3,13 +3,22 @@ from __future__ import annotations
 from pathlib import Path
 from typing import List, Optional, Tuple
 
-import joblib
 from pydantic import BaseModel, Field, ValidationError
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfTransformer
 
 from src.tools.schema import PolicyQueryResult, PolicySnippet
 from src.tools.pdf_parser import parse_legislation_text
+from src.tools.tfidf_utils import (
+    build_hashing_vectorizer,
+    build_score_matrix,
+    cosine_scores,
+    hash_documents,
+    index_exists,
+    load_index,
+    prune_document_frequency,
+    save_index,
+    top_k_indices,
+)
 from config.settings import RagMode
 
 
@@ -62,7 +71,8 @@ class LegislationRAG:
 
     def __init__(self, config: LegislationRAGConfig) -> None:
         self._config = config
-        self._vectorizer: Optional[TfidfVectorizer] = None
+        self._vectorizer: HashingVectorizer = build_hashing_vectorizer()
+        self._transformer: Optional[TfidfTransformer] = None
         self._matrix = None
         self._snippets_meta: List[Tuple[str, int]] = []  # (text, page)
 
@@ -80,8 +90,7 @@ class LegislationRAG:
     def _index_exists(self) -> bool:
         """Check whether a TF-IDF index has already been persisted on disk."""
 
-        index_file = self._config.index_dir / "s257_tfidf.joblib"
-        return index_file.exists()
+        return index_exists(self._config.index_dir, "s257_tfidf")
 
     def _build_index(self) -> None:
         """Build a TF-IDF vector index from the S.257 PDF.
@@ -111,41 +120,34 @@ class LegislationRAG:
         if not texts:
             raise RuntimeError("No text could be extracted from the S.257 PDF.")
 
-        vectorizer = TfidfVectorizer(
-            max_features=50_000,
-            ngram_range=(1, 2),
-            stop_words="english",
-        )
-        matrix = vectorizer.fit_transform(texts)
+        counts = hash_documents(self._vectorizer, texts)
+        transformer = TfidfTransformer()
+        matrix_csc = build_score_matrix(transformer.fit_transform(prune_document_frequency(counts)))
 
-        self._ensure_index_dir()
-        index_file = self._config.index_dir / "s257_tfidf.joblib"
-        joblib.dump(
-            {
-                "vectorizer": vectorizer,
-                "matrix": matrix,
-                "meta": meta,
-            },
-            index_file,
+        save_index(
+            self._config.index_dir,
+            "s257_tfidf",
+            transformer=transformer,
+            matrix_csc=matrix_csc,
+            records=meta,
         )
 
-        self._vectorizer = vectorizer
-        self._matrix = matrix
+        self._transformer = transformer
+        self._matrix = matrix_csc
         self._snippets_meta = meta
 
     def _load_or_build_index(self) -> None:
         """Load an existing TF-IDF index or build it if missing."""
 
-        if self._vectorizer is not None and self._matrix is not None:
+        if self._transformer is not None and self._matrix is not None:
             return
 
         self._ensure_index_dir()
-        index_file = self._config.index_dir / "s257_tfidf.joblib"
         if self._index_exists():
-            data = joblib.load(index_file)
-            self._vectorizer = data["vectorizer"]
-            self._matrix = data["matrix"]
-            self._snippets_meta = data["meta"]
+            data = load_index(self._config.index_dir, "s257_tfidf")
+            self._transformer = data["transformer"]
+            self._matrix = data["matrix_csc"]
+            self._snippets_meta = [(text, page) for text, page in data["records"]]
         else:
             self._build_index()
 
@@ -168,23 +170,23 @@ class LegislationRAG:
         except (FileNotFoundError, ValidationError, ValueError) as exc:
             raise RuntimeError(f"Failed to initialize legislative RAG index: {exc}") from exc
 
-        if self._vectorizer is None or self._matrix is None:
+        if self._transformer is None or self._matrix is None:
             raise RuntimeError("Legislation RAG index is not initialized.")
 
-        query_vec = self._vectorizer.transform([query])
-        scores = cosine_similarity(query_vec, self._matrix)[0]
+        query_vec = self._transformer.transform(self._vectorizer.transform([query]))
+        scores = cosine_scores(self._matrix, query_vec)
 
         # Get indices of top-k scores
-        top_indices = scores.argsort()[::-1][:k]
+        top_indices = top_k_indices(scores, k)
 
         snippets: list[PolicySnippet] = []
-        for idx in top_indices:
+        for idx, score in zip(top_indices.tolist(), scores[top_indices].tolist()):
             text, page_num = self._snippets_meta[idx]
             snippets.append(
                 PolicySnippet(
                     text=text,
                     page=int(page_num),
-                    score=float(scores[idx]),
+                    score=score,
                     source_path=self._config.pdf_path,
                     source_title=self._config.source_title,
                 )
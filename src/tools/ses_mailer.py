@@ -1,14 +1,143 @@
 from __future__ import annotations
 
 import json
+import logging
 import os
+import threading
+from collections import deque
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Deque, Iterable, Optional
 
 import boto3
+import orjson
 from botocore.exceptions import ClientError, NoCredentialsError
 
+logger = logging.getLogger(__name__)
+
 DATA_SERIES_PATH = Path("data/output/data_series.json")
+ALERT_LOG_PATH = Path("data/output/alerts.json")
+ALERT_LOG_LIMIT = 20
+# UI-ready projection of the log, one row per alert in dashboard column order.
+ALERT_ROWS_PATH = Path("data/output/alerts.rows.json")
+ALERT_ROW_FIELDS = ("timestamp", "location", "score", "recipient", "status")
+# Leading marker of the success message; the UI keys its notification on it.
+ALERT_SENT_PREFIX = "✅"
+
+# Newest-first dashboard history, read from disk once per process. This module
+# is the only writer of ALERT_LOG_PATH, so later sends never re-read the file.
+_recent_alerts: Optional[Deque[Dict[str, Any]]] = None
+_alerts_lock = threading.Lock()
+
+
+@lru_cache(maxsize=4)
+def _ses_client(
+    aws_region: str, aws_access_key: Optional[str], aws_secret_key: Optional[str]
+):
+    """Build (once per credentials/region) a thread-safe SES V2 client."""
+
+    return boto3.client(
+        'sesv2',
+        region_name=aws_region,
+        aws_access_key_id=aws_access_key,
+        aws_secret_access_key=aws_secret_key
+    )
+
+
+@lru_cache(maxsize=2)
+def _load_data_series(path: str, mtime_ns: int) -> Dict[str, List[Dict[str, Any]]]:
+    """Parse the date-keyed risk series once per file version.
+
+    Alerts are typically sent for several dates against the same demo output,
+    so the series is kept parsed until the file is regenerated. Callers must
+    not mutate the returned mapping.
+    """
+
+    return orjson.loads(Path(path).read_bytes())
+
+
+@lru_cache(maxsize=32)
+def _alert_message(path: str, mtime_ns: int, target_date: str) -> tuple[int, str, str]:
+    """Return `(count, subject, body)` of the consolidated alert for a date.
+
+    Formatted once per date and file version; re-sending the same date reuses
+    the text. A count of 0 means the date has no high-risk events.
+    """
+
+    daily_records = _load_data_series(path, mtime_ns).get(target_date, [])
+    high_risk_events = [
+        item for item in daily_records 
+        if item.get("riskLevel", "").lower() == "high"
+    ]
+    if not high_risk_events:
+        return 0, "", ""
+
+    # Build the list of affected areas
+    affected_areas_text = "".join(
+        f"- {event.get('nameFull', 'Unknown County')}, {event.get('state', 'US')} "
+        f"(Risk: {event.get('riskType', 'General Risk')})\n"
+        for event in high_risk_events
+    )
+
+    count = len(high_risk_events)
+    subject = f"🚨 URGENT: High Supply Chain Risk Detected in {count} Regions ({target_date})"
+    
+    body_text = (
+        f"SUPPLY CHAIN ALERT REPORT\n"
+        f"Date: {target_date}\n"
+        f"Severity: HIGH\n\n"
+        f"The AI Control Tower has detected critical risk levels in the following {count} regions:\n\n"
+        f"{affected_areas_text}\n"
+        f"IMMEDIATE ACTION REQUIRED:\n"
+        f"1. Review inventory buffers for affected regions.\n"
+        f"2. Contact suppliers in these counties.\n"
+        f"3. Monitor real-time status on the dashboard.\n\n"
+        f"🔗 Access Live Control Tower: https://oact-sepia.vercel.app/\n\n"
+        f"--\n"
+        f"AI Control Tower | System Automated Alert"
+    )
+    return count, subject, body_text
+
+
+def _load_recent_alerts() -> Deque[Dict[str, Any]]:
+    global _recent_alerts
+    if _recent_alerts is None:
+        existing: List[Dict[str, Any]] = []
+        if ALERT_LOG_PATH.exists():
+            existing = orjson.loads(ALERT_LOG_PATH.read_bytes())
+        # The log is newest-first: keep its head, not the tail `maxlen` would.
+        _recent_alerts = deque(existing[:ALERT_LOG_LIMIT], maxlen=ALERT_LOG_LIMIT)
+    return _recent_alerts
+
+
+def alert_rows(alerts: Iterable[Dict[str, Any]]) -> List[List[Any]]:
+    """Project alert entries onto the dashboard's `ALERT_ROW_FIELDS` columns."""
+
+    return [[item.get(field) for field in ALERT_ROW_FIELDS] for item in alerts]
+
+
+def _write_json_atomic(path: Path, payload: Any) -> None:
+    # Written beside the target and swapped in with `os.replace`, so the
+    # dashboard polling the file never sees a half-written list.
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(payload, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def _record_alert(entry: Dict[str, Any]) -> None:
+    """Prepend an alert to the dashboard log and persist the bounded history.
+
+    Alongside the full log, the table rows the dashboard shows are written
+    to `ALERT_ROWS_PATH`, so readers load them as-is without reshaping.
+    """
+
+    with _alerts_lock:
+        alerts = _load_recent_alerts()
+        alerts.appendleft(entry)
+        _write_json_atomic(ALERT_LOG_PATH, list(alerts))
+        _write_json_atomic(ALERT_ROWS_PATH, alert_rows(alerts))
+
 
 def broadcast_risk_alert_ses(
     target_date: str,
@@ -28,69 +157,32 @@ def broadcast_risk_alert_ses(
         return f"Error: Processed data file not found at {DATA_SERIES_PATH}. Please run 'demo' first."
     
     try:
-        with open(DATA_SERIES_PATH, "r") as f:
-            data = json.load(f)
+        data_path = str(DATA_SERIES_PATH)
+        mtime_ns = DATA_SERIES_PATH.stat().st_mtime_ns
+        data = _load_data_series(data_path, mtime_ns)
     except Exception as e:
         return f"Error reading data file: {e}"
 
     if target_date not in data:
         return f"No data found for date: {target_date}. Available dates: {list(data.keys())[:3]}..."
 
-    # 2. Filter High Risk
-    daily_records = data[target_date]
-    high_risk_events = [
-        item for item in daily_records 
-        if item.get("riskLevel", "").lower() == "high"
-    ]
+    # 2. Filter High Risk and format the consolidated message
+    count, subject, body_text = _alert_message(data_path, mtime_ns, target_date)
 
-    if not high_risk_events:
+    if not count:
         return f"No 'high' risk events detected for {target_date}. Operations normal."
 
     # 3. Initialize SES Client
     # If keys are not provided, boto3 will look for env vars or ~/.aws/credentials
     try:
-        ses_client = boto3.client(
-            'sesv2',
-            region_name=aws_region,
-            aws_access_key_id=aws_access_key,
-            aws_secret_access_key=aws_secret_key
-        )
+        ses_client = _ses_client(aws_region, aws_access_key, aws_secret_key)
     except Exception as e:
          return f"Failed to initialize AWS SES Client: {e}"
 
     sent_count = 0
     errors = []
 
-    # 4. Aggregate and Send Single Email
-    if not high_risk_events:
-        return f"No 'high' risk events detected for {target_date}. Operations normal."
-
-    # Build the list of affected areas
-    affected_areas_text = ""
-    for event in high_risk_events:
-        county = event.get("nameFull", "Unknown County")
-        state = event.get("state", "US")
-        risk_type = event.get("riskType", "General Risk")
-        affected_areas_text += f"- {county}, {state} (Risk: {risk_type})\n"
-
-    count = len(high_risk_events)
-    subject = f"🚨 URGENT: High Supply Chain Risk Detected in {count} Regions ({target_date})"
-    
-    body_text = (
-        f"SUPPLY CHAIN ALERT REPORT\n"
-        f"Date: {target_date}\n"
-        f"Severity: HIGH\n\n"
-        f"The AI Control Tower has detected critical risk levels in the following {count} regions:\n\n"
-        f"{affected_areas_text}\n"
-        f"IMMEDIATE ACTION REQUIRED:\n"
-        f"1. Review inventory buffers for affected regions.\n"
-        f"2. Contact suppliers in these counties.\n"
-        f"3. Monitor real-time status on the dashboard.\n\n"
-        f"🔗 Access Live Control Tower: https://oact-sepia.vercel.app/\n\n"
-        f"--\n"
-        f"AI Control Tower | System Automated Alert"
-    )
-
+    # 4. Send Single Email
     try:
         response = ses_client.send_email(
             FromEmailAddress=sender_email,
@@ -115,28 +207,19 @@ def broadcast_risk_alert_ses(
         
         # Log to Dashboard File
         try:
-            alert_log_path = Path("data/output/alerts.json")
-            new_entry = {
-                "timestamp": target_date,
-                "location": f"{count} Regions (Consolidated)",
-                "score": "HIGH",
-                "recipient": placeholder_recipient,
-                "status": "SENT (SES V2)"
-            }
-            
-            existing_alerts = []
-            if alert_log_path.exists():
-                with open(alert_log_path, "r") as f:
-                    existing_alerts = json.load(f)
-            
-            existing_alerts.insert(0, new_entry)
-            
-            with open(alert_log_path, "w") as f:
-                json.dump(existing_alerts[:20], f, indent=2)
+            _record_alert(
+                {
+                    "timestamp": target_date,
+                    "location": f"{count} Regions (Consolidated)",
+                    "score": "HIGH",
+                    "recipient": placeholder_recipient,
+                    "status": "SENT (SES V2)"
+                }
+            )
         except Exception as log_err:
-            print(f"Dashboard logging failed: {log_err}")
+            logger.warning("Dashboard logging failed: %s", log_err)
 
-        return f"✅ Consolidated alert sent to {placeholder_recipient} covering {count} high-risk regions."
+        return f"{ALERT_SENT_PREFIX} Consolidated alert sent to {placeholder_recipient} covering {count} high-risk regions."
 
     except NoCredentialsError:
             return "AWS Credentials not found. Please configure AWS_ACCESS_KEY_ID and AWS_SECRET_ACCESS_KEY."
@@ -0,0 +1,234 @@
+from __future__ import annotations
+
+from functools import lru_cache
+from pathlib import Path
+import re
+from typing import Any
+
+import joblib
+from joblib import Parallel, delayed, effective_n_jobs
+import numpy as np
+import orjson
+from scipy import sparse
+from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS, HashingVectorizer, TfidfTransformer
+from sklearn.preprocessing import normalize
+
+# 2**18 hashed term buckets keeps collisions negligible for these corpora.
+HASHED_FEATURES = 2**18
+# Corpora smaller than this are hashed in-process; worker start-up would dominate.
+PARALLEL_HASHING_MIN_DOCS = 2_000
+# Terms in more than this share of documents are pruned before IDF fitting.
+MAX_DOCUMENT_FREQUENCY = 0.9
+# Tokenizer settings shared by every engine's vectorizer (sklearn's defaults).
+_STOP_WORDS = frozenset(ENGLISH_STOP_WORDS)
+_TOKEN_RE = re.compile(r"(?u)\b\w\w+\b")
+
+
+@lru_cache(maxsize=1)
+def build_hashing_vectorizer() -> HashingVectorizer:
+    """Return the stateless term-count vectorizer shared by the RAG engines.
+
+    Hashing replaces the fitted vocabulary of `TfidfVectorizer`: nothing needs
+    to be pickled for it, and `transform` hashes terms instead of looking them
+    up in a Python dict. IDF weighting is fitted separately with a
+    `TfidfTransformer`. The vectorizer holds no fitted state, so one instance
+    is built per process and handed to every engine.
+    """
+
+    return HashingVectorizer(
+        n_features=HASHED_FEATURES,
+        ngram_range=(1, 2),
+        stop_words=_STOP_WORDS,
+        token_pattern=_TOKEN_RE.pattern,
+        alternate_sign=False,
+        norm=None,
+    )
+
+
+def hash_documents(vectorizer: HashingVectorizer, texts: list[str], *, n_jobs: int = -1):
+    """Hash `texts` into term counts, splitting large corpora across workers.
+
+    The vectorizer is stateless, so batches can be transformed independently
+    and stacked back in order. Tokenization is pure Python and holds the GIL,
+    hence the process-based default joblib backend rather than threads.
+    """
+
+    workers = effective_n_jobs(n_jobs)
+    if workers <= 1 or len(texts) < PARALLEL_HASHING_MIN_DOCS:
+        return vectorizer.transform(texts)
+
+    batch_size = -(-len(texts) // workers)
+    batches = [texts[start : start + batch_size] for start in range(0, len(texts), batch_size)]
+    parts = Parallel(n_jobs=workers)(delayed(vectorizer.transform)(batch) for batch in batches)
+    return sparse.vstack(parts, format="csr")
+
+
+def prune_document_frequency(
+    counts, *, min_df: int = 1, max_df: float = MAX_DOCUMENT_FREQUENCY
+):
+    """Drop hashed terms outside the `[min_df, max_df]` document-frequency band.
+
+    Mirrors `TfidfVectorizer`'s `min_df`/`max_df` (ints are document counts,
+    floats are proportions), which `HashingVectorizer` cannot apply itself.
+    Pruned columns become empty posting lists, so `cosine_scores` skips them
+    like any unseen term. Very common terms carry little IDF weight but have
+    the longest postings, so removing them shrinks the per-query gather most.
+    Unlike sklearn, which raises when no term survives, the `max_df` cap is
+    dropped for corpora too small for it to leave any term.
+    """
+
+    counts = sparse.csr_matrix(counts)
+    n_docs = counts.shape[0]
+    min_count = min_df if isinstance(min_df, int) else min_df * n_docs
+    max_count = max_df if isinstance(max_df, int) else max_df * n_docs
+    doc_freq = np.bincount(counts.indices, minlength=counts.shape[1])
+    pruned = doc_freq < min_count
+    too_common = doc_freq > max_count
+    # On tiny corpora `max_df` can exclude every term (one document allows
+    # 0.9 documents per term); skip it then instead of emptying the index.
+    if ((doc_freq > 0) & ~pruned & ~too_common).any():
+        pruned |= too_common
+    counts.data[pruned[counts.indices]] = 0
+    counts.eliminate_zeros()
+    return counts
+
+
+def _index_files(index_dir: Path, name: str) -> tuple[Path, Path, Path]:
+    return (
+        index_dir / f"{name}_matrix.npz",
+        index_dir / f"{name}_records.json",
+        index_dir / f"{name}_transformer.joblib",
+    )
+
+
+def index_exists(index_dir: Path, name: str) -> bool:
+    """Check whether every file of a persisted TF-IDF index is on disk."""
+
+    return all(path.exists() for path in _index_files(index_dir, name))
+
+
+def save_index(
+    index_dir: Path,
+    name: str,
+    *,
+    transformer: TfidfTransformer,
+    matrix_csc: sparse.csc_matrix,
+    records: list[Any],
+) -> None:
+    """Persist a TF-IDF index as an `.npz` matrix, JSON records and a joblib transformer.
+
+    Only the small fitted transformer goes through pickle; the sparse matrix
+    buffers and the record list use their native formats.
+    """
+
+    index_dir.mkdir(parents=True, exist_ok=True)
+    matrix_file, records_file, transformer_file = _index_files(index_dir, name)
+    sparse.save_npz(matrix_file, matrix_csc)
+    records_file.write_bytes(orjson.dumps(records))
+    joblib.dump(transformer, transformer_file)
+
+
+@lru_cache(maxsize=4)
+def _load_index_cached(
+    index_dir: str, name: str, mtimes_ns: tuple[int, ...]
+) -> dict[str, Any]:
+    matrix_file, records_file, transformer_file = _index_files(Path(index_dir), name)
+    return {
+        "transformer": joblib.load(transformer_file),
+        "matrix_csc": sparse.load_npz(matrix_file).tocsc(),
+        "records": orjson.loads(records_file.read_bytes()),
+    }
+
+
+def load_index(index_dir: Path, name: str) -> dict[str, Any]:
+    """Load a persisted TF-IDF index, shared process-wide until its files change.
+
+    RAG engines are often instantiated per request, so caching on the index
+    files' mtimes avoids reloading the matrix and transformer on every call.
+    The returned payload is shared and must be treated as read-only.
+    """
+
+    mtimes_ns = tuple(path.stat().st_mtime_ns for path in _index_files(index_dir, name))
+    return _load_index_cached(str(index_dir), name, mtimes_ns)
+
+
+def normalize_rows(matrix):
+    """L2-normalize TF-IDF rows in place so cosine similarity is a plain dot."""
+
+    return normalize(matrix, norm="l2", copy=False)
+
+
+def build_score_matrix(tfidf) -> sparse.csc_matrix:
+    """Return the row-normalized float32 CSC matrix that `cosine_scores` expects.
+
+    Single precision halves the memory read per query, which is what bounds
+    the sparse scoring; scores stay accurate well beyond ranking needs.
+    """
+
+    return normalize_rows(tfidf).tocsc().astype(np.float32)
+
+
+def cosine_scores(matrix_csc, query_vec) -> np.ndarray:
+    """Score one query row against a row-normalized TF-IDF matrix.
+
+    `matrix_csc` is the L2-normalized document-term matrix (see
+    `normalize_rows`) in CSC layout, so each term column is an inverted-index
+    posting list. Only the postings of the query's non-zero terms are read
+    and accumulated straight into a dense score vector, so the cost is
+    proportional to their document frequencies and no sparse intermediate
+    is built.
+    """
+
+    indptr = matrix_csc.indptr
+    starts = indptr[query_vec.indices]
+    lengths = indptr[query_vec.indices + 1] - starts
+    # Hashed terms that never occur in the corpus would otherwise carry the
+    # maximum IDF and dilute every score; drop them like an out-of-vocabulary
+    # term.
+    present = lengths > 0
+    starts = starts[present]
+    lengths = lengths[present]
+    weights = query_vec.data[present]
+    # Inline L2 normalization of the (tiny) query row.
+    norm = np.sqrt(weights @ weights)
+    if norm == 0:
+        return np.zeros(matrix_csc.shape[0])
+
+    # Flat positions of every posting of the query terms, in one gather.
+    offsets = starts - (np.cumsum(lengths) - lengths)
+    positions = np.arange(lengths.sum()) + np.repeat(offsets, lengths)
+    return np.bincount(
+        matrix_csc.indices[positions],
+        weights=matrix_csc.data[positions] * np.repeat(weights / norm, lengths),
+        minlength=matrix_csc.shape[0],
+    )
+
+
+def top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """Return indices of the `k` highest scores, best first.
+
+    Uses an O(N) partial selection and only sorts the selected `k` entries.
+    """
+
+    if k <= 0 or scores.size == 0:
+        return np.empty(0, dtype=np.intp)
+    if k >= scores.size:
+        return np.argsort(-scores, kind="stable")
+    top = np.argpartition(-scores, k - 1)[:k]
+    return top[np.argsort(-scores[top], kind="stable")]
+
+
+__all__ = [
+    "HASHED_FEATURES",
+    "MAX_DOCUMENT_FREQUENCY",
+    "build_hashing_vectorizer",
+    "build_score_matrix",
+    "cosine_scores",
+    "hash_documents",
+    "index_exists",
+    "load_index",
+    "normalize_rows",
+    "prune_document_frequency",
+    "save_index",
+    "top_k_indices",
+]
@@ -1,52 +1,115 @@
 from __future__ import annotations
 
-import json
+import asyncio
+import os
+from functools import lru_cache
 from pathlib import Path
 import random
 import time
-import re
 import gradio as gr
+import orjson
 
-from src.agents.chatbot import generate_reply, list_local_models
+from src.agents.chatbot import (
+    ParsedMessage,
+    generate_reply,
+    list_local_models,
+    parse_message,
+    warm_up_model,
+)
+from src.tools.ses_mailer import (
+    ALERT_LOG_PATH,
+    ALERT_ROWS_PATH,
+    ALERT_SENT_PREFIX,
+    alert_rows,
+)
 
-ALERT_LOG = Path("data/output/alerts.json")
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+ALERT_LOG = ALERT_LOG_PATH
+ALERT_ROWS = ALERT_ROWS_PATH
+MODEL_LIST_TTL_SECONDS = 30
 
-def get_alerts():
-    if not ALERT_LOG.exists():
-        return []
+PERSONA_INTRO = (
+    "Hello. I am an AI Control Tower agent aligned with the S.257 proposal to "
+    "strengthen U.S. supply-chain resilience.\n\n"
+    "Current capabilities:\n"
+    "1) Secure, confidence-focused dialogue.\n"
+    "2) Power outage risk prediction and dashboard summaries.\n"
+    "3) Resilience alert reporting via email broadcasts.\n"
+    "4) High-confidence answers grounded in local sensitive datasets (RAG)."
+)
+ALERT_TABLE_HEADERS = [
+    "Timestamp",
+    "Target Region",
+    "Risk Coefficient",
+    "Designated Stakeholder",
+    "Operational Status",
+]
+
+
+@lru_cache(maxsize=1)
+def _cached_models(ttl_bucket: int) -> tuple[str, ...]:
+    return tuple(list_local_models())
+
+
+def get_local_models() -> list[str]:
+    """Return local Ollama models, re-running `ollama list` at most every TTL."""
+
+    return list(_cached_models(int(time.time()) // MODEL_LIST_TTL_SECONDS))
+
+
+@lru_cache(maxsize=2)
+def _alert_rows(path: str, mtime_ns: int, size: int) -> tuple[tuple, ...]:
+    # Failures are cached like results: a broken file yields no rows and is
+    # not re-read until its mtime or size changes.
     try:
-        with open(ALERT_LOG, "r") as f:
-            data = json.load(f)
-            # Convert list of dicts to list of lists to match headers
-            # Headers: Timestamp, Target Region, Risk Coefficient, Designated Stakeholder, Operational Status
-            return [
-                [
-                    item.get("timestamp"),
-                    item.get("location"),
-                    item.get("score"),
-                    item.get("recipient"),
-                    item.get("status")
-                ]
-                for item in data
-            ]
-    except:
-        return []
+        data = orjson.loads(Path(path).read_bytes())
+        if path == str(ALERT_LOG):
+            # Log written before the rows file existed: reshape dicts to rows.
+            data = alert_rows(data)
+        return tuple(tuple(row) for row in data)
+    except (OSError, orjson.JSONDecodeError, AttributeError, TypeError):
+        return ()
 
-def launch_app() -> None:
-    project_root = Path(__file__).resolve().parents[2]
-    persona_intro = (
-        "Hello. I am an AI Control Tower agent aligned with the S.257 proposal to "
-        "strengthen U.S. supply-chain resilience.\n\n"
-        "Current capabilities:\n"
-        "1) Secure, confidence-focused dialogue.\n"
-        "2) Power outage risk prediction and dashboard summaries.\n"
-        "3) Resilience alert reporting via email broadcasts.\n"
-        "4) High-confidence answers grounded in local sensitive datasets (RAG)."
+
+def _alert_log_stats() -> dict[Path, os.stat_result]:
+    stats = {}
+    for path in (ALERT_ROWS, ALERT_LOG):
+        try:
+            stats[path] = path.stat()
+        except OSError:
+            pass
+    return stats
+
+
+def alert_log_version() -> tuple:
+    """Return a cheap token that changes whenever the alert files change."""
+
+    return tuple(
+        (path.name, stat.st_mtime_ns, stat.st_size)
+        for path, stat in _alert_log_stats().items()
     )
 
-    def _workflow_steps(message: str) -> list[str]:
-        lower_message = message.lower()
-        if re.search(r"today is (\d{4}-\d{2}-\d{2})", lower_message):
+
+def get_alerts():
+    """Return the alert log as table rows, re-parsing only when the file changes.
+
+    Called on every chat step and dashboard refresh. The mailer writes the
+    rows pre-shaped to `ALERT_ROWS`; reads are keyed on mtime and size, so an
+    unchanged file costs a single `stat()`.
+    """
+
+    stats = _alert_log_stats()
+    if not stats:
+        return []
+    # Prefer the pre-shaped rows unless the log was replaced after them.
+    path = max(stats, key=lambda candidate: stats[candidate].st_mtime_ns)
+    stat = stats[path]
+    rows = _alert_rows(str(path), stat.st_mtime_ns, stat.st_size)
+    return [list(row) for row in rows]
+
+def launch_app() -> None:
+    def _workflow_steps(parsed: ParsedMessage) -> list[str]:
+        if parsed.alert_date:
             return [
                 "[] Validating date and recipient metadata.",
                 "[] Loading risk data for the target date.",
@@ -54,19 +117,14 @@ def launch_app() -> None:
                 "[] Dispatching resilience alert via SES.",
                 "[] Logging alert status to the dashboard.",
             ]
-        if "demo" in lower_message:
+        if parsed.is_demo:
             return [
                 "[] Validating demo workflow request.",
                 "[] Locating registered provider datasets.",
                 "[] Converting provider data to UI-ready JSON.",
                 "[] Preparing dashboard output artifacts.",
             ]
-        company_match = re.search(
-            r"(?:for the company|company)\s+([a-z0-9\s\-]+?)(?:,|\?|$)",
-            lower_message,
-        )
-        company_name = company_match.group(1).strip() if company_match else ""
-        if "asteria circuits" in lower_message or company_name == "asteria circuits":
+        if parsed.mentions_company:
             return [
                 "[] Identifying target entity in local records.",
                 "[] Loading the pseudo company knowledge index.",
@@ -75,54 +133,88 @@ def launch_app() -> None:
             ]
         return []
 
-    def respond(message, history, selected_model):
-        history = history + [{"role": "user", "content": message}]
-        yield "", history, get_alerts()
+    def _sync_alerts(seen_version):
+        # Rows are sent only when the log changed since this session last
+        # received them; otherwise the client keeps its table as-is.
+        version = alert_log_version()
+        if version == seen_version:
+            return gr.update(), seen_version
+        return get_alerts(), version
+
+    def refresh_alerts():
+        version = alert_log_version()
+        return get_alerts(), version
 
-        for step in _workflow_steps(message):
-            history = history + [{"role": "assistant", "content": step}]
-            yield "", history, get_alerts()
-            time.sleep(random.uniform(3, 5))
+    async def respond(message, history, selected_model, alerts_version):
+        # Gradio hands us a fresh copy per call, so append in place rather than
+        # copying the whole history on every streamed step.
+        history.append({"role": "user", "content": message})
+        table, alerts_version = _sync_alerts(alerts_version)
+        yield "", history, table, alerts_version
 
-        reply = generate_reply(
-            project_root=project_root,
+        # Parsed once here; the step list and the reply both read the result.
+        parsed = parse_message(message)
+        # The alert log only changes once the reply has run, so intermediate
+        # steps leave the dashboard table untouched instead of re-sending it.
+        for step in _workflow_steps(parsed):
+            history.append({"role": "assistant", "content": step})
+            yield "", history, gr.update(), alerts_version
+            await asyncio.sleep(random.uniform(3, 5))
+
+        # The reply does blocking LLM/RAG/SES work; keep it off the event loop.
+        reply = await asyncio.to_thread(
+            generate_reply,
+            project_root=PROJECT_ROOT,
             user_message=message,
             model_override=selected_model or None,
+            parsed=parsed,
         )
         # If an email was sent, trigger a formal browser notification
-        if "✅" in reply:
+        if reply.startswith(ALERT_SENT_PREFIX):
             gr.Info("COMMUNICATION PROTOCOL: Resilience Alert Broadcasted to Stakeholders")
 
-        history = history + [{"role": "assistant", "content": reply}]
-        yield "", history, get_alerts()
+        history.append({"role": "assistant", "content": reply})
+        table, alerts_version = _sync_alerts(alerts_version)
+        yield "", history, table, alerts_version
+
+    # Enumerate models and load the alert log once, before building the layout.
+    models = get_local_models()
+    initial_alerts, initial_alerts_version = refresh_alerts()
+    # Load the default model while the UI starts, not on the first chat turn.
+    warm_up_model(project_root=PROJECT_ROOT, model_override=models[0] if models else None)
 
     with gr.Blocks(title="AI Control Tower", theme=gr.themes.Soft()) as demo:
         gr.Markdown("# 🏛️ AI Control Tower: Supply-Chain Resilience")
+        # Per-session version of the alert rows this client already shows.
+        alerts_version = gr.State(initial_alerts_version)
         
         with gr.Tabs():
             # TAB 1: OPERATOR CONSOLE
             with gr.TabItem("📡 Analyst Console"):
                 chatbot = gr.Chatbot(
                     height=500,
-                    value=[{"role": "assistant", "content": persona_intro}],
+                    value=[{"role": "assistant", "content": PERSONA_INTRO}],
                 )
                 msg = gr.Textbox(label="Decision Support Query", placeholder="Enter query or use broadcast action below...")
                 with gr.Row():
-                    models = list_local_models()
                     model_selector = gr.Dropdown(choices=models, value=models[0] if models else None, label="Active Intelligence Model")
 
             # TAB 2: AGENCY DASHBOARD
             with gr.TabItem("📊 Agency Oversight Dashboard"):
                 gr.Markdown("## 📋 Automated Notification Log")
                 alert_table = gr.Dataframe(
-                    headers=["Timestamp", "Target Region", "Risk Coefficient", "Designated Stakeholder", "Operational Status"],
-                    value=get_alerts(),
+                    headers=ALERT_TABLE_HEADERS,
+                    value=initial_alerts,
                     interactive=False
                 )
                 refresh_btn = gr.Button("Sync Dashboard Data")
 
         # Logic
-        msg.submit(respond, [msg, chatbot, model_selector], [msg, chatbot, alert_table])
-        refresh_btn.click(get_alerts, None, alert_table)
+        msg.submit(
+            respond,
+            [msg, chatbot, model_selector, alerts_version],
+            [msg, chatbot, alert_table, alerts_version],
+        )
+        refresh_btn.click(refresh_alerts, None, [alert_table, alerts_version])
 
     demo.launch()